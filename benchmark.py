@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Construction throughput and memory footprint of the suffix tree implementations,
+on a random word over a small alphabet.
+
+The suffix tree truncated at depth 'k' used for k-mer counting is measured as well.
+
+Usage: python3 benchmark.py [length] [alphabet] [k]
+By default, a word of length 100000 over the alphabet 'ACGTN', and 'k = 6'.
+"""
+
+import random
+import sys
+import time
+
+import short_ukkonen
+import packed_ukkonen
+import kmer_tree
+from memory_report import memory_report
+
+def random_word(n :int, alphabet :str) -> str:
+    """
+    Returns:
+        A random word of length 'n' over 'alphabet'.
+    """
+    return ''.join(random.choice(alphabet) for _ in range(n))
+
+def run(name :str, build, word) -> dict:
+    """
+    Build a suffix tree and measure it.
+    Args:
+        name: The name printed for this implementation.
+        build: A function taking 'word' and returning a suffix tree.
+        word: The input word.
+    Returns:
+        The dictionnary returned by 'memory_report', with the additional key 'seconds'.
+    """
+    start = time.perf_counter()
+    tree = build(word)
+    seconds = time.perf_counter() - start
+    report = memory_report(tree, word)
+    report['seconds'] = seconds
+    print("%-16s %8.3f s %12.0f chars/s %14d bytes %8.1f bytes/char" % (
+        name, seconds, len(word) / seconds if seconds else float('inf'),
+        report['total_bytes'], report['bytes_per_char'] or 0))
+    return report
+
+def main(n :int, alphabet :str, k :int):
+    word = random_word(n, alphabet)
+    print("length = %s alphabet = %s" % (n, alphabet))
+    generic = run('generic', short_ukkonen.ukkonen, word)
+    packed = run('packed', lambda w: packed_ukkonen.ukkonen(w, alphabet), word)
+    print("packed / generic: time %.2f, memory %.2f" % (
+        packed['seconds'] / generic['seconds'] if generic['seconds'] else float('nan'),
+        packed['total_bytes'] / generic['total_bytes']))
+    truncated = run('depth %s' % k, lambda w: kmer_tree.truncated_suffix_tree(w, k), word)
+    print("depth %s / generic: time %.2f, memory %.2f" % (
+        k, truncated['seconds'] / generic['seconds'] if generic['seconds'] else float('nan'),
+        truncated['total_bytes'] / generic['total_bytes']))
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    alphabet = sys.argv[2] if len(sys.argv) > 2 else 'ACGTN'
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    main(n, alphabet, k)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pairwise longest common substrings of a batch of documents, in a single traversal
+of their generalized suffix tree.
+
+The documents 'd_0, ..., d_{N-1}' are concatenated into a single word
+'d_0 $_0 d_1 $_1 ... d_{N-1} $_{N-1}', where the separators '$_i' are letters
+occurring nowhere else, and the suffix tree of this word is built by 'short_ukkonen'.
+The letters, which may be characters or tokens, are first remapped to integers.
+Because the word ends with a letter occurring only once, each suffix corresponds to a leaf.
+Because the separators occur only once, the factor of an internal node contains no separator,
+so it is a common substring of all the documents having a leaf below this node.
+
+The longest common substring of 'd_i' and 'd_j' is thus the maximal string depth
+of a node having leaves of both 'd_i' and 'd_j' below it.
+The tree is traversed once, bottom-up, and the set of the documents below each node
+is represented by a bitmask.
+The nodes are visited by decreasing string depth, so the value of a pair is final
+at the first node where its two documents meet, and each pair is written once.
+
+>>> longest_common_substrings(['abcde', 'xbcdy', 'zzcdz'], as_numpy = False)
+[[5, 3, 2], [3, 5, 2], [2, 2, 5]]
+>>> longest_common_substrings([['the', 'suffix', 'tree'], ['a', 'suffix', 'tree']], as_numpy = False)
+[[3, 2], [2, 3]]
+"""
+
+from bisect import bisect_right
+from short_ukkonen import ukkonen
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ROOT, SUFFIX, LEAF = 0, 'suffix', 'leaf'
+
+def generalized_word(documents) -> tuple:
+    """
+    Concatenate documents with distinct separators.
+    The letters are remapped to integer codes, so that no letter of a document
+    (for instance the token 'suffix') can be mistaken for the key 'suffix' of 'short_ukkonen'.
+    Args:
+        documents: A list of str instances, or of sequences of hashable letters.
+    Returns:
+        A pair (word, ends) where 'word' is the list of the codes of the concatenation,
+        and 'ends[i]' is the position of the separator following the 'i'-th document.
+        The letters have non-negative codes, and the separator following
+        the 'i'-th document has the code '-1 - i'.
+    """
+    codes, word, ends = {}, [], []
+    for i, document in enumerate(documents):
+        word.extend(codes.setdefault(letter, len(codes)) for letter in document)
+        ends.append(len(word))
+        word.append(-1 - i)
+    return word, ends
+
+def _bits(mask :int):
+    """
+    Returns:
+        A generator of the indices of the bits set in 'mask'.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def longest_common_substrings(documents, as_numpy = True):
+    """
+    Compute the length of the longest common substring of each pair of documents.
+    Args:
+        documents: A list of 'N' str instances, or of sequences of hashable letters.
+        as_numpy: If True and NumPy is available, return a NumPy array.
+    Returns:
+        The 'N x N' symmetric matrix 'lcs', where 'lcs[i][j]' is the length of the
+        longest common substring of 'documents[i]' and 'documents[j]',
+        and 'lcs[i][i]' is the length of 'documents[i]'.
+        It is a NumPy array of integers, or a list of lists if NumPy is not used.
+    """
+    word, ends = generalized_word(documents)
+    lcs = [[0] * len(documents) for _ in documents]
+    for i, document in enumerate(documents):
+        lcs[i][i] = len(document)
+    if word:
+        tree = ukkonen(word)[3]
+        order, stack = [], [(ROOT, 0)]
+        while stack:
+            node, depth = stack.pop()
+            order.append((node, depth))
+            for letter, edge in tree[node].items():
+                if letter != SUFFIX and edge[2] != LEAF:
+                    stack.append((edge[2], depth + edge[1]))
+        # A child is deeper than its parent, so the deepest nodes first is a bottom-up order.
+        # Moreover, the first node where a pair of documents meets gives its longest common substring.
+        order.sort(key = lambda node_depth: node_depth[1], reverse = True)
+        # 'settled[i]' is the set of the documents whose pair with 'i' has its final value.
+        settled = [1 << i for i in range(len(documents))]
+        masks = {}
+        for node, depth in order:
+            below = 0
+            for letter, edge in tree[node].items():
+                if letter == SUFFIX:
+                    continue
+                position, _, child = edge
+                if child == LEAF:
+                    # The leaf corresponds to the suffix starting at 'position - depth'.
+                    mask = 1 << bisect_right(ends, position - depth - 1)
+                else:
+                    mask = masks.pop(child)
+                # 'node' is the deepest common ancestor of the pairs of leaves
+                # taken from 'mask' and from the children already visited.
+                # A pair of documents both in 'mask', or both in 'below',
+                # already met at a deeper node, so only the other pairs are considered.
+                only_below, only_mask = below & ~mask, mask & ~below
+                if depth > 0 and only_below and only_mask:
+                    if bin(only_below).count('1') > bin(only_mask).count('1'):
+                        only_below, only_mask = only_mask, only_below
+                    for i in _bits(only_below):
+                        new = only_mask & ~settled[i]
+                        if not new:
+                            continue
+                        settled[i] |= new
+                        row = lcs[i]
+                        for j in _bits(new):
+                            row[j] = lcs[j][i] = depth
+                            settled[j] |= 1 << i
+                below |= mask
+            masks[node] = below
+    if as_numpy and numpy is not None:
+        return numpy.array(lcs, dtype = numpy.int64).reshape(len(documents), len(documents))
+    return lcs
+
+if __name__ == '__main__':
+    import sys
+    documents = sys.argv[1:] or ["the quick brown fox", "the quick red fox", "a lazy brown dog"]
+    for row in longest_common_substrings(documents, as_numpy = False):
+        print(" ".join("%3d" % x for x in row))
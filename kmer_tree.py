@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Suffix tree truncated at string depth 'k', for k-mer counting.
+
+The full suffix tree of a word of length 'n' has about '2 n' nodes whatever 'k' is.
+The tree built here only contains the factors of length at most 'k',
+so it has at most twice as many nodes as there are distinct k-mers.
+The construction inserts, for each position 'i', the k-mer 'word[i: i + k]'
+in a compacted tree, in time O(n k) and memory O(number of distinct k-mers).
+
+The memory saving only holds when the number of distinct k-mers is much smaller than 'n',
+for instance when 'sigma ** k' is much smaller than 'n' for a random word over 'sigma' letters.
+When almost all the k-mers are distinct, the truncated tree has about as many nodes
+as the full suffix tree, and is only smaller because its leaf edges are stored
+as a single integer instead of a triplet.
+
+The representation follows 'short_ukkonen'.
+'tree' is a list, whose first element is the root.
+'tree[s]' is a dictionnary such that
+'tree[s][word[position]] == (position, length, t)' for each edge from the internal node 's'
+to the internal node 't' marked by the string 'word[position: position + length]'.
+All the leaves are at string depth exactly 'k', because all the inserted words have length 'k'.
+The leaves are not stored in 'tree', and an edge towards a leaf is a single negative integer
+'-1 - (count * n + start)' instead of a triplet, where 'word[start: start + k]' is the k-mer
+of the leaf and 'count' is its number of occurrences in 'word'.
+The string of this edge is 'word[start + depth: start + k]', where 'depth' is the string depth of 's'.
+The tree has no suffix links.
+
+>>> list(kmers('abcabxabcd', 2))
+[('ab', 3), ('bc', 2), ('bx', 1), ('ca', 1), ('cd', 1), ('xa', 1)]
+>>> sorted(kmers('aaaa', 3))
+[('aaa', 2)]
+>>> kmer_arrays('abcabxabcd', 2, as_numpy = False)
+([0, 1, 4, 2, 8, 5], [3, 2, 1, 1, 1, 1])
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ROOT = 0
+
+def leaf_edge(start :int, count :int, n :int) -> int:
+    """
+    Returns:
+        The integer representing an edge towards the leaf of the k-mer 'word[start: start + k]',
+        which has 'count' occurrences in the word 'word' of length 'n'.
+    """
+    return -1 - (count * n + start)
+
+def leaf_start_and_count(edge :int, n :int) -> tuple:
+    """
+    Returns:
+        The pair (start, count) represented by the leaf edge 'edge', for a word of length 'n'.
+    """
+    count, start = divmod(-1 - edge, n)
+    return start, count
+
+def truncated_suffix_tree(word, k :int) -> list:
+    """
+    Build the suffix tree of 'word' truncated at string depth 'k'.
+    Args:
+        word: A str instance, or any sequence of hashable letters.
+        k: The maximal string depth, a positive integer.
+    Returns:
+        The list representing the truncated suffix tree.
+    """
+    if k <= 0:
+        raise ValueError("k must be positive, got %s" % k)
+    n = len(word)
+    tree = [{}]
+    for i in range(n - k + 1):
+        node, depth = ROOT, 0
+        while True:
+            letter = word[i + depth]
+            edge = tree[node].get(letter)
+            if edge is None:
+                # addition of the leaf
+                tree[node][letter] = leaf_edge(i, 1, n)
+                break
+            if isinstance(edge, int):
+                start, count = leaf_start_and_count(edge, n)
+                position, length, child = start + depth, k - depth, edge
+            else:
+                position, length, child = edge
+            # The first letters are equal, so the first mismatch, if any, is at an offset 'j >= 1'.
+            j = 1
+            while j < length and word[position + j] == word[i + depth + j]:
+                j += 1
+            if j == length:
+                if depth + length == k:
+                    # The edge leads to the leaf of this k-mer: one more occurrence.
+                    tree[node][letter] = leaf_edge(start, count + 1, n)
+                    break
+                # The whole edge is read: move to the child.
+                depth += length
+                node = child
+                continue
+            # creation of a new node in the middle of the edge
+            new_node = len(tree)
+            tree.append({
+                # A leaf edge keeps the same integer, since its k-mer is unchanged.
+                word[position + j]: child if child < 0 else (position + j, length - j, child),
+                word[i + depth + j]: leaf_edge(i, 1, n),
+            })
+            tree[node][letter] = (position, j, new_node)
+            break
+    return tree
+
+def _starts_and_counts(tree :list, n :int):
+    """
+    Returns:
+        A generator of the pairs (start, count) of the leaves of 'tree', built from a word
+        of length 'n', in increasing lexicographic order of their k-mers.
+    """
+    # 'stack' contains the edges still to visit, the next one on the top.
+    stack = [tree[ROOT][letter] for letter in sorted(tree[ROOT], reverse = True)]
+    while stack:
+        edge = stack.pop()
+        if isinstance(edge, int):
+            yield leaf_start_and_count(edge, n)
+        else:
+            child = edge[2]
+            stack.extend(tree[child][letter] for letter in sorted(tree[child], reverse = True))
+
+def kmers(word, k :int, tree :list = None):
+    """
+    Enumerate the distinct k-mers of 'word' with their number of occurrences.
+    The k-mers are generated in increasing lexicographic order, one at a time.
+    Args:
+        word: A str instance, or any sequence of hashable and comparable letters.
+        k: The length of the k-mers.
+        tree: The output of 'truncated_suffix_tree(word, k)'.
+            If None, it is built.
+    Returns:
+        A generator of pairs (kmer, count), where 'kmer' is a slice of 'word'.
+    """
+    if tree is None:
+        tree = truncated_suffix_tree(word, k)
+    for start, count in _starts_and_counts(tree, len(word)):
+        yield word[start: start + k], count
+
+def kmer_arrays(word, k :int, tree :list = None, as_numpy = True) -> tuple:
+    """
+    Collect the distinct k-mers of 'word' with their number of occurrences in two arrays.
+    Args:
+        word: A str instance, or any sequence of hashable and comparable letters.
+        k: The length of the k-mers.
+        tree: The output of 'truncated_suffix_tree(word, k)'.
+            If None, it is built.
+        as_numpy: If True and NumPy is available, return NumPy arrays.
+    Returns:
+        A pair (starts, counts) where, for the 'r'-th k-mer in increasing lexicographic order,
+        'word[starts[r]: starts[r] + k]' is the k-mer and 'counts[r]' its number of occurrences.
+        They are NumPy arrays of integers, or lists if NumPy is not used.
+    """
+    if tree is None:
+        tree = truncated_suffix_tree(word, k)
+    starts, counts = [], []
+    for start, count in _starts_and_counts(tree, len(word)):
+        starts.append(start)
+        counts.append(count)
+    if as_numpy and numpy is not None:
+        return numpy.array(starts, dtype = numpy.int64), numpy.array(counts, dtype = numpy.int64)
+    return starts, counts
+
+if __name__ == '__main__':
+    import sys
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    word = sys.argv[1] if len(sys.argv) > 1 else "ACGTNACGTTACGN"
+    for kmer, count in kmers(word, k):
+        print("%s\t%s" % (kmer, count))
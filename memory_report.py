@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Memory footprint of the suffix trees built by the three implementations.
+
+'memory_report' accepts any of the following outputs:
+- the tuple '(node, position, length, tree)' returned by 'short_ukkonen.ukkonen',
+- the list of dictionnaries returned by 'faithful_ukkonen.ukkonen',
+- the 'ImplicitState' returned by 'abstract_ukkonen.ukkonen'
+  (or directly its 'GraphWithEdgeContent'),
+- the tuple returned by 'packed_ukkonen.ukkonen' (or directly its 'PackedSuffixTree'),
+- the list returned by 'kmer_tree.truncated_suffix_tree', whose leaf edges are negative integers.
+
+In all cases, the tree is a list of dictionnaries, one per stored node.
+A value of such a dictionnary is either an edge, stored as a tuple whose last
+element is the target node, or a suffix link, stored under the key 'suffix'.
+An edge is a "leaf edge" when its target is not the index of a stored node
+('leaf' in 'short_ukkonen', 'None' in 'abstract_ukkonen'),
+or when the target node has no out-going edge ('faithful_ukkonen').
+
+The footprint is split in disjoint parts, each Python object being counted once.
+The size in bytes of the part 'x' is stored under the key 'x_bytes':
+- 'dict_overhead': the list of nodes, the node dictionnaries and their keys,
+- 'tuple_overhead': the headers of the edge tuples,
+- 'internal_nodes': the slots and the values of the edges towards internal nodes,
+- 'leaf_edges': the slots and the values of the edges towards leaves,
+- 'suffix_links': the values of the suffix links, and for each of them
+  its share (size divided by number of entries) of the table of its dictionnary,
+- 'text': the word the tree was built from, when it is known.
+Small integers and 'math.inf' are shared by CPython, so they are counted at most once.
+A node index referenced both by a suffix link and by an edge is charged to the suffix link.
+
+The counts are the same for all the implementations:
+'nodes' is the number of internal nodes plus the number of leaves (one per leaf edge).
+The sentinel BOTTOM of 'faithful_ukkonen' and its edges towards the root
+are not counted as nodes and edges, and their size goes to 'dict_overhead'.
+The suffix link of the root is a convention (a link to itself in 'short_ukkonen'
+and 'packed_ukkonen', to BOTTOM in 'faithful_ukkonen', none in 'abstract_ukkonen'),
+so it is not counted as a suffix link, and its size goes to 'dict_overhead'.
+
+A 'PackedSuffixTree' stores no dictionnary nor tuple: the child slots of its
+edges go to 'internal_nodes' and 'leaf_edges', its suffix array to 'suffix_links',
+and its empty child slots, array headers, template rows and alphabet to 'dict_overhead'.
+
+>>> from short_ukkonen import ukkonen
+>>> report = memory_report(ukkonen('abcabxabcd'), 'abcabxabcd')
+>>> report['internal_nodes'], report['leaf_edges'], report['edges'], report['suffix_links']
+(6, 10, 15, 5)
+"""
+
+import sys
+
+SUFFIX = 'suffix'
+
+def _unwrap(tree) -> tuple:
+    """
+    Args:
+        tree: The output of one of the three implementations.
+    Returns:
+        A pair (adjacencies, word), where 'adjacencies' is the list of dictionnaries
+        representing the tree and 'word' is the retained text, or None if unknown.
+    """
+    if isinstance(tree, tuple):
+        # short_ukkonen or packed_ukkonen: (node, position, length, tree)
+        tree = tree[-1]
+        if hasattr(tree, 'text'):
+            return tree, tree.text
+        return tree, None
+    if hasattr(tree, 'text') and hasattr(tree, 'starts'):
+        # packed_ukkonen: PackedSuffixTree
+        return tree, tree.text
+    if hasattr(tree, 'tree') and hasattr(tree, 'word'):
+        # abstract_ukkonen: ImplicitState
+        return tree.tree.__adjacencies__, tree.word
+    if hasattr(tree, '__adjacencies__'):
+        # abstract_ukkonen: GraphWithEdgeContent
+        return tree.__adjacencies__, None
+    # faithful_ukkonen
+    return tree, None
+
+def _is_internal(adjacencies :list, target) -> bool:
+    """
+    Returns:
+        True iff 'target' is the index of a stored node having at least one out-going edge.
+    """
+    if isinstance(target, bool) or not isinstance(target, int):
+        return False
+    if not 0 <= target < len(adjacencies):
+        return False
+    return any(isinstance(value, tuple) for value in adjacencies[target].values())
+
+def _faithful_bottom(adjacencies :list):
+    """
+    Returns:
+        The index of the sentinel BOTTOM of a tree built by 'faithful_ukkonen',
+        or None if 'adjacencies' has no such node.
+    """
+    if (len(adjacencies) > 1 and isinstance(adjacencies[0], dict) and isinstance(adjacencies[1], dict)
+            and SUFFIX not in adjacencies[0] and adjacencies[1].get(SUFFIX) == 0
+            and all(edge == (0, 0, 1) for edge in adjacencies[0].values())):
+        return 0
+    return None
+
+def _packed_memory_report(tree, text) -> dict:
+    """
+    Compute the memory footprint of a 'packed_ukkonen.PackedSuffixTree'.
+    Args:
+        tree: A 'PackedSuffixTree'.
+        text: The 'PackedText' the tree was built from.
+    Returns:
+        The same dictionnary as 'memory_report'.
+    """
+    slot_size = tree.starts.itemsize + tree.lengths.itemsize + tree.children.itemsize
+    report = {
+        'nodes': 0,
+        'internal_nodes': 0,
+        'edges': 0,
+        'leaf_edges': 0,
+        'suffix_links': 0,
+        'internal_nodes_bytes': 0,
+        'leaf_edges_bytes': 0,
+        # The slot of the root's suffix link goes to 'dict_overhead'.
+        'suffix_links_bytes': sys.getsizeof(tree.suffix) - tree.suffix.itemsize,
+        'dict_overhead_bytes': sys.getsizeof(tree) + sys.getsizeof(tree.__dict__) + tree.suffix.itemsize,
+        'tuple_overhead_bytes': 0,
+        'text_bytes': sys.getsizeof(text) + sys.getsizeof(text.buffer),
+        'text_length': len(text),
+    }
+    for array in (tree.starts, tree.lengths, tree.children,
+                  tree.__empty_starts__, tree.__empty_lengths__, tree.__empty_children__):
+        report['dict_overhead_bytes'] += sys.getsizeof(array)
+    report['dict_overhead_bytes'] += sys.getsizeof(tree.alphabet)
+    for node in range(tree.num_nodes()):
+        is_internal = False
+        for slot in range(node * tree.width, (node + 1) * tree.width):
+            if tree.starts[slot] == -1:
+                continue
+            is_internal = True
+            report['edges'] += 1
+            if tree.children[slot] == -1:
+                report['leaf_edges'] += 1
+        if is_internal:
+            report['internal_nodes'] += 1
+        if node != 0 and tree.suffix[node] != -1:
+            report['suffix_links'] += 1
+    # The slots are counted in the arrays' sizes, and moved to the edges.
+    report['leaf_edges_bytes'] = report['leaf_edges'] * slot_size
+    report['internal_nodes_bytes'] = (report['edges'] - report['leaf_edges']) * slot_size
+    report['dict_overhead_bytes'] -= report['edges'] * slot_size
+    report['nodes'] = report['internal_nodes'] + report['leaf_edges']
+    report['total_bytes'] = sum(value for key, value in report.items() if key.endswith('_bytes'))
+    report['bytes_per_char'] = report['total_bytes'] / len(text) if len(text) else None
+    return report
+
+def memory_report(tree, word = None) -> dict:
+    """
+    Compute the memory footprint of a suffix tree.
+    Args:
+        tree: The output of 'short_ukkonen.ukkonen', 'faithful_ukkonen.ukkonen',
+            'abstract_ukkonen.ukkonen' or 'packed_ukkonen.ukkonen'.
+        word: The word used to build the tree. If None, the word stored in
+            'tree' is used when there is one, otherwise the text is not counted.
+    Returns:
+        A dictionnary with the node and edge counts,
+        the size in bytes of each part of the footprint,
+        their sum 'total_bytes', and 'bytes_per_char'.
+    """
+    adjacencies, stored_word = _unwrap(tree)
+    if hasattr(adjacencies, 'starts'):
+        return _packed_memory_report(adjacencies, stored_word)
+    if word is None:
+        word = stored_word
+    seen = set()
+
+    def size(obj) -> int:
+        # Shared objects (small integers, interned letters, ...) are counted once.
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    report = {
+        'nodes': 0,
+        'internal_nodes': 0,
+        'edges': 0,
+        'leaf_edges': 0,
+        'suffix_links': 0,
+        'internal_nodes_bytes': 0,
+        'leaf_edges_bytes': 0,
+        'suffix_links_bytes': 0,
+        'dict_overhead_bytes': size(adjacencies),
+        'tuple_overhead_bytes': 0,
+        'text_bytes': 0,
+    }
+    empty_tuple_size = sys.getsizeof(())
+    bottom = _faithful_bottom(adjacencies)
+    root = 0 if bottom is None else bottom + 1
+    # The suffix links own the node indices they point to, so that their size
+    # does not depend on which edge towards the same node is visited first.
+    for node, d in enumerate(adjacencies):
+        if node != root and SUFFIX in d:
+            report['suffix_links'] += 1
+            report['suffix_links_bytes'] += size(d[SUFFIX])
+    for node, d in enumerate(adjacencies):
+        dict_bytes = size(d)
+        if node != root and SUFFIX in d:
+            # A suffix link is charged its share of the table of its dictionnary.
+            share = dict_bytes // len(d)
+            report['suffix_links_bytes'] += share
+            dict_bytes -= share
+        report['dict_overhead_bytes'] += dict_bytes
+        is_internal = False
+        for key, value in d.items():
+            report['dict_overhead_bytes'] += size(key)
+            if key == SUFFIX:
+                continue
+            if isinstance(value, int) and value < 0:
+                # A leaf edge stored as a single integer ('kmer_tree').
+                is_internal = True
+                report['edges'] += 1
+                report['leaf_edges'] += 1
+                report['leaf_edges_bytes'] += size(value)
+                continue
+            if not isinstance(value, tuple):
+                # Any other annotation stored in a node.
+                report['dict_overhead_bytes'] += size(value)
+                continue
+            if node == bottom:
+                report['dict_overhead_bytes'] += size(value) + sum(size(x) for x in value)
+                continue
+            is_internal = True
+            report['edges'] += 1
+            # The tuple header goes to 'tuple_overhead', its slots and values to the edge.
+            edge_bytes = 0
+            if id(value) not in seen:
+                edge_bytes = size(value) - empty_tuple_size + sum(size(x) for x in value)
+                report['tuple_overhead_bytes'] += empty_tuple_size
+            if _is_internal(adjacencies, value[-1]):
+                report['internal_nodes_bytes'] += edge_bytes
+            else:
+                report['leaf_edges'] += 1
+                report['leaf_edges_bytes'] += edge_bytes
+        if is_internal:
+            report['internal_nodes'] += 1
+    report['nodes'] = report['internal_nodes'] + report['leaf_edges']
+    if word is not None:
+        report['text_bytes'] = size(word)
+        report['text_length'] = len(word)
+    report['total_bytes'] = sum(value for key, value in report.items() if key.endswith('_bytes'))
+    report['bytes_per_char'] = report['total_bytes'] / len(word) if word else None
+    return report
+
+def format_memory_report(report :dict) -> str:
+    """
+    Args:
+        report: A dictionnary returned by 'memory_report'.
+    Returns:
+        A human readable multi-line string.
+    """
+    lines = [
+        "nodes: %(nodes)s (internal: %(internal_nodes)s)" % report,
+        "edges: %(edges)s (leaf edges: %(leaf_edges)s)" % report,
+        "suffix links: %(suffix_links)s" % report,
+    ]
+    for part in ('internal_nodes', 'leaf_edges', 'suffix_links',
+                 'dict_overhead', 'tuple_overhead', 'text'):
+        lines.append("%-16s %12d bytes" % (part, report[part + '_bytes']))
+    lines.append("%-16s %12d bytes" % ('total', report['total_bytes']))
+    if report['bytes_per_char'] is not None:
+        lines.append("%-16s %12.1f bytes" % ('per char', report['bytes_per_char']))
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    import short_ukkonen, faithful_ukkonen, abstract_ukkonen, packed_ukkonen
+    word = "abcabxabcd"
+    for name, tree in (
+        ('short_ukkonen', short_ukkonen.ukkonen(word)),
+        ('faithful_ukkonen', faithful_ukkonen.ukkonen(word)),
+        ('abstract_ukkonen', abstract_ukkonen.ukkonen(word)),
+        ('packed_ukkonen', packed_ukkonen.ukkonen(word)),
+    ):
+        print(name)
+        print(format_memory_report(memory_report(tree, word)))
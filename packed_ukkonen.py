@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A small-alphabet variant of 'short_ukkonen', for DNA or protein-like sequences.
+
+The algorithm is the one of 'short_ukkonen', only the storage changes.
+- The letters are remapped once, at input time, to codes '0, ..., sigma - 1'
+  where 'sigma' is the size of the alphabet (at most 16).
+- The text is stored in a 'PackedText', using 'bits' bits per letter
+  (2 bits for 'ACGT', 3 bits for 'ACGTN', 4 bits for up to 16 letters).
+- Instead of one dictionnary per internal node, the tree has 'sigma' fixed-width
+  child slots per node, stored in three flat arrays 'starts', 'lengths', 'children':
+  the edge of the node 's' starting with the letter of code 'c' is stored at the slot
+  's * sigma + c', and corresponds to 'tree[s][letter] == (start, length, child)'
+  in 'short_ukkonen'.
+  An empty slot has 'starts[slot] == EMPTY'.
+  A leaf edge has 'lengths[slot] == tree.infinity' and 'children[slot] == LEAF'.
+- The suffix links are stored in the flat array 'suffix', one entry per node.
+
+>>> import short_ukkonen
+>>> node, position, length, tree = ukkonen('ACGTNACGTTACGN')
+>>> (node, position, length) == short_ukkonen.ukkonen('ACGTNACGTTACGN')[:3]
+True
+>>> to_dict_tree(tree) == short_ukkonen.ukkonen('ACGTNACGTTACGN')[3]
+True
+"""
+
+import math
+from array import array
+
+ROOT = 0
+LEAF = -1
+EMPTY = -1
+MAX_BITS = 4
+
+class PackedText:
+    """
+    A word over a small alphabet, stored with 'bits' bits per letter.
+    Indexing a 'PackedText' returns the code of the letter, not the letter itself.
+    """
+
+    def __init__(self, word, alphabet = None):
+        """
+        Constructor.
+        Args:
+            word: The word to store.
+            alphabet: The letters that may appear in 'word', in the order of their codes.
+                By default, the sorted letters of 'word'.
+        """
+        if alphabet is None:
+            alphabet = sorted(set(word))
+        self.alphabet = tuple(alphabet)
+        codes = {letter: code for (code, letter) in enumerate(self.alphabet)}
+        if len(codes) != len(self.alphabet):
+            raise ValueError("The alphabet contains repeated letters")
+        self.bits = max(1, (len(self.alphabet) - 1).bit_length())
+        if self.bits > MAX_BITS:
+            raise ValueError("The alphabet has %s letters, at most %s are supported"
+                % (len(self.alphabet), 1 << MAX_BITS))
+        self.mask = (1 << self.bits) - 1
+        self.length = len(word)
+        # One extra byte, so that a letter can always be read from two consecutive bytes.
+        self.buffer = bytearray((self.length * self.bits + 7) // 8 + 1)
+        if isinstance(word, str) and all(isinstance(letter, str) for letter in self.alphabet):
+            # Each letter is replaced by the bits of its code, least significant first,
+            # so that the reversed string is the binary expansion of the packed buffer.
+            unknown = set(word).difference(codes)
+            if unknown:
+                raise ValueError("The letter %r is not in the alphabet" % (min(unknown),))
+            table = {ord(letter): format(code, '0%sb' % self.bits)[::-1] for (letter, code) in codes.items()}
+            expansion = word.translate(table)[::-1]
+            if expansion:
+                self.buffer[:] = int(expansion, 2).to_bytes(len(self.buffer), 'little')
+            return
+        bit = 0
+        for letter in word:
+            try:
+                code = codes[letter]
+            except KeyError:
+                raise ValueError("The letter %r is not in the alphabet" % (letter,))
+            self.buffer[bit >> 3] |= (code << (bit & 7)) & 0xff
+            if (bit & 7) + self.bits > 8:
+                self.buffer[(bit >> 3) + 1] |= code >> (8 - (bit & 7))
+            bit += self.bits
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i :int) -> int:
+        """
+        Returns:
+            The code of the 'i'-th letter.
+        """
+        if not 0 <= i < self.length:
+            raise IndexError("PackedText index out of range")
+        bit = i * self.bits
+        byte = bit >> 3
+        return ((self.buffer[byte] | (self.buffer[byte + 1] << 8)) >> (bit & 7)) & self.mask
+
+    def __str__(self) -> str:
+        """
+        Returns:
+            The stored word, when its letters are characters.
+        """
+        return "".join(str(self.alphabet[self[i]]) for i in range(self.length))
+
+class PackedSuffixTree:
+    """
+    A suffix tree with 'width' fixed-width child slots per node.
+    See the documentation of the module for the meaning of the arrays.
+    """
+
+    def __init__(self, text :PackedText):
+        """
+        Constructor. The tree only contains the root.
+        Args:
+            text: The packed word the tree is built from.
+        """
+        self.text = text
+        self.alphabet = text.alphabet
+        self.width = len(text.alphabet)
+        # Positions and lengths fit in 32 bits for words shorter than 2**31 - 1 letters.
+        typecode = 'i' if len(text) < 2 ** 31 - 1 else 'q'
+        self.infinity = 2 ** (8 * array(typecode).itemsize - 1) - 1
+        self.__empty_starts__ = array(typecode, [EMPTY]) * self.width
+        self.__empty_lengths__ = array(typecode, [self.infinity]) * self.width
+        self.__empty_children__ = array(typecode, [LEAF]) * self.width
+        self.starts = array(typecode)
+        self.lengths = array(typecode)
+        self.children = array(typecode)
+        self.suffix = array(typecode)
+        self.add_node()
+
+    def num_nodes(self) -> int:
+        """
+        Returns:
+            The number of nodes stored in this tree (the leaves are not stored).
+        """
+        return len(self.suffix)
+
+    def add_node(self) -> int:
+        """
+        Add a node with empty child slots.
+        Returns:
+            The index of the newly added node.
+        """
+        self.starts.extend(self.__empty_starts__)
+        self.lengths.extend(self.__empty_lengths__)
+        self.children.extend(self.__empty_children__)
+        self.suffix.append(EMPTY)
+        return len(self.suffix) - 1
+
+def ukkonen(word, alphabet = None) -> tuple:
+    """
+    Build the suffix tree representing an input word over a small alphabet.
+    Args:
+        word: The word, or a 'PackedText' already built from it.
+        alphabet: The letters that may appear in 'word' (at most 16).
+            By default, the sorted letters of 'word'.
+    Returns:
+        The tuple '(node, position, length, tree)' described in 'short_ukkonen',
+        where 'tree' is a 'PackedSuffixTree'.
+    """
+    text = word if isinstance(word, PackedText) else PackedText(word, alphabet)
+    tree = PackedSuffixTree(text)
+    sigma, INFINITY = tree.width, tree.infinity
+    starts, lengths, children, suffix = tree.starts, tree.lengths, tree.children, tree.suffix
+    # The letters are decoded inline from the packed buffer, without bounds checks,
+    # as in 'PackedText.__getitem__'. 'position_letter' is the code of 'text[position]'
+    # whenever 'length > 0'.
+    buffer, bits, mask = text.buffer, text.bits, text.mask
+    # 'tree.add_node', inlined.
+    empty_starts, empty_lengths, empty_children = \
+        tree.__empty_starts__, tree.__empty_lengths__, tree.__empty_children__
+    node, position, length, length_node_child, child = ROOT, 0, 0, 0, 0
+    position_letter = 0
+    for p in range(len(text)):
+        bit = p * bits
+        letter = ((buffer[bit >> 3] | (buffer[(bit >> 3) + 1] << 8)) >> (bit & 7)) & mask
+        previous_node = ROOT
+        # The next loop treats canonical non-explicit nodes which do not have a 'letter' continuation.
+        while length > 0:
+            bit = (position + length) * bits
+            next_letter = ((buffer[bit >> 3] | (buffer[(bit >> 3) + 1] << 8)) >> (bit & 7)) & mask
+            if next_letter == letter:
+                break
+            # creation of a new node
+            slot = node * sigma + position_letter
+            length_node_child, child = lengths[slot], children[slot]
+            new_node = len(suffix)
+            starts.extend(empty_starts)
+            lengths.extend(empty_lengths)
+            children.extend(empty_children)
+            suffix.append(EMPTY)
+            leaf_slot = new_node * sigma + letter
+            starts[leaf_slot], lengths[leaf_slot], children[leaf_slot] = p, INFINITY, LEAF
+            split_slot = new_node * sigma + next_letter
+            starts[split_slot], lengths[split_slot], children[split_slot] = \
+                position + length, length_node_child - length, child
+            starts[slot], lengths[slot], children[slot] = position, length, new_node
+            # addition of the suffix link
+            suffix[previous_node] = new_node
+            previous_node = new_node
+            # move to the suffix non-canonical implicit node
+            if node == ROOT:
+                position += 1
+                length -= 1
+                if length == 0:
+                    continue
+                bit = position * bits
+                position_letter = ((buffer[bit >> 3] | (buffer[(bit >> 3) + 1] << 8)) >> (bit & 7)) & mask
+            else:
+                node = suffix[node]
+            # canonization of the implicit node
+            slot = node * sigma + position_letter
+            length_node_child, child = lengths[slot], children[slot]
+            while length_node_child <= length:
+                node = child
+                position += length_node_child
+                length -= length_node_child
+                if length == 0:
+                    break
+                bit = position * bits
+                position_letter = ((buffer[bit >> 3] | (buffer[(bit >> 3) + 1] << 8)) >> (bit & 7)) & mask
+                slot = node * sigma + position_letter
+                length_node_child, child = lengths[slot], children[slot]
+            if length > 0:
+                position = starts[slot]
+        # The next loop deals with explicit nodes which are not the root and do not have a 'letter' transition.
+        while node != ROOT and length == 0 and starts[node * sigma + letter] == EMPTY:
+            slot = node * sigma + letter
+            starts[slot], lengths[slot], children[slot] = p, INFINITY, LEAF
+            suffix[previous_node] = node
+            previous_node = node
+            node = suffix[node]
+        # The case of the root without a 'letter' transition.
+        if node == ROOT and starts[letter] == EMPTY:
+            starts[letter], lengths[letter], children[letter] = p, INFINITY, LEAF
+            length = 0
+            suffix[previous_node] = ROOT
+        # An implicit or explicit node which has a 'letter' transition.
+        else:
+            if length == 0:
+                suffix[previous_node] = node
+                slot = node * sigma + letter
+                position_letter = letter
+            else:
+                slot = node * sigma + position_letter
+            position, length_node_child, child = starts[slot], lengths[slot], children[slot]
+            length += 1
+            if length_node_child == length:
+                node = child
+                length = 0
+    suffix[ROOT] = ROOT
+    if length == 0:
+        position = 0
+    return node, position, length, tree
+
+def to_dict_tree(tree :PackedSuffixTree) -> list:
+    """
+    Convert a packed tree to the list of dictionnaries used by 'short_ukkonen'.
+    Args:
+        tree: A 'PackedSuffixTree'.
+    Returns:
+        The list of dictionnaries representing the same suffix tree.
+    """
+    dict_tree = []
+    for node in range(tree.num_nodes()):
+        d = {}
+        for code, letter in enumerate(tree.alphabet):
+            slot = node * tree.width + code
+            if tree.starts[slot] == EMPTY:
+                continue
+            if tree.children[slot] == LEAF:
+                d[letter] = (tree.starts[slot], math.inf, 'leaf')
+            else:
+                d[letter] = (tree.starts[slot], tree.lengths[slot], tree.children[slot])
+        if tree.suffix[node] != EMPTY:
+            d['suffix'] = tree.suffix[node]
+        dict_tree.append(d)
+    return dict_tree
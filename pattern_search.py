@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Search of a restricted regular expression in the suffix tree built by 'short_ukkonen'.
+
+The pattern is compiled into a small non-deterministic automaton (Thompson's construction),
+which is run along the edges of the suffix tree, starting from the root.
+Each implicit node of the tree corresponds to a factor of 'word',
+and the set of states reached after reading this factor is computed once
+for all its occurrences.
+A branch is abandoned as soon as this set is empty, so a selective pattern
+only visits a small part of the tree.
+When the set contains the final state, all the leaves below give an occurrence.
+
+The supported syntax is:
+- a letter matches itself,
+- an escaped symbol '\\x', where 'x' is neither an ASCII letter nor a digit, matches 'x',
+- '.' matches any letter,
+- '\\d', '\\w', '\\s' match an ASCII digit, word letter ('[a-zA-Z0-9_]') or whitespace,
+  and '\\D', '\\W', '\\S' match any other letter,
+- '[abc]', '[a-z]', '[^abc]' match a letter of (or not in) a class,
+  which may contain '\\d', '\\w' and '\\s' but not their negations,
+- 'e?', 'e*', 'e+', 'e{m}', 'e{m,}', 'e{m,n}' repeat the previous element 'e'.
+Groups, alternatives, anchors and the other escaped ASCII letters or digits
+are not supported, and raise a ValueError.
+
+The result is the sorted list of the positions 'i' such that
+a prefix of 'word[i:]' matches the pattern.
+
+>>> from short_ukkonen import ukkonen
+>>> word = 'error: timeout, errr timeout, eror: ok'
+>>> search(word, ukkonen(word), 'err?r.*timeout')
+[0, 16]
+>>> search('abcabxabcd', ukkonen('abcabxabcd'), '[a-c]{2}[^b]')
+[0, 1, 3, 6, 7]
+>>> search('code 404 timeout', ukkonen('code 404 timeout'), r'\\d+\\stimeout')
+[5, 6, 7]
+"""
+
+import math
+import string
+
+ROOT, SUFFIX, LEAF = 0, 'suffix', 'leaf'
+CHAR, SPLIT, MATCH = 0, 1, 2
+ANY = None
+SPECIAL = set('()|^$')
+SHORTHANDS = {
+    'd': frozenset(string.digits),
+    'w': frozenset(string.ascii_letters + string.digits + '_'),
+    's': frozenset(' \t\n\r\f\v'),
+}
+
+class NFA:
+    """
+    A non-deterministic automaton with epsilon transitions.
+    The state 's' is described by 'kinds[s]', 'classes[s]' and 'outs[s]':
+    - a CHAR state reads a letter of 'classes[s]' and goes to 'outs[s][0]',
+    - a SPLIT state goes without reading anything to any state of 'outs[s]',
+    - the MATCH state is the final state.
+    A class is either 'ANY', or a pair '(letters, negated)'.
+    """
+
+    def __init__(self):
+        """
+        Constructor. The automaton has no state.
+        """
+        self.kinds = []
+        self.classes = []
+        self.outs = []
+        self.start = None
+        self.__steps__ = {}
+
+    def add_state(self, kind :int, letter_class = ANY) -> int:
+        """
+        Returns:
+            The index of the newly added state.
+        """
+        self.kinds.append(kind)
+        self.classes.append(letter_class)
+        self.outs.append([])
+        return len(self.kinds) - 1
+
+    def closure(self, states) -> frozenset:
+        """
+        Returns:
+            The CHAR and MATCH states reachable from 'states' by epsilon transitions.
+        """
+        stack, seen = list(states), set(states)
+        while stack:
+            s = stack.pop()
+            if self.kinds[s] == SPLIT:
+                for t in self.outs[s]:
+                    if t not in seen:
+                        seen.add(t)
+                        stack.append(t)
+        return frozenset(s for s in seen if self.kinds[s] != SPLIT)
+
+    def initial(self) -> frozenset:
+        """
+        Returns:
+            The set of states before reading any letter.
+        """
+        return self.closure([self.start])
+
+    def step(self, states :frozenset, letter) -> frozenset:
+        """
+        Returns:
+            The set of states reached from 'states' by reading 'letter'.
+        """
+        key = (states, letter)
+        if key not in self.__steps__:
+            targets = []
+            for s in states:
+                if self.kinds[s] != CHAR:
+                    continue
+                letter_class = self.classes[s]
+                if letter_class is ANY or ((letter in letter_class[0]) != letter_class[1]):
+                    targets.append(self.outs[s][0])
+            self.__steps__[key] = self.closure(targets)
+        return self.__steps__[key]
+
+    def is_final(self, states :frozenset) -> bool:
+        """
+        Returns:
+            True iff 'states' contains the final state.
+        """
+        return any(self.kinds[s] == MATCH for s in states)
+
+def _escaped_class(pattern :str, i :int) -> tuple:
+    """
+    Args:
+        pattern: The regular expression.
+        i: The position of the letter following a backslash.
+    Returns:
+        The class '(letters, negated)' matched by the escape sequence.
+    """
+    letter = pattern[i]
+    if letter.lower() in SHORTHANDS:
+        return (SHORTHANDS[letter.lower()], letter.isupper())
+    if letter.isascii() and letter.isalnum():
+        raise ValueError("Unsupported escape \\%s in %r" % (letter, pattern))
+    return (frozenset(letter), False)
+
+def _parse_class(pattern :str, i :int) -> tuple:
+    """
+    Parse a character class starting after the '[' at position 'i - 1'.
+    Returns:
+        A pair (letter_class, i) where 'i' is the position after the closing ']'.
+    """
+    negated = i < len(pattern) and pattern[i] == '^'
+    if negated:
+        i += 1
+    letters = set()
+    first = True
+    while i < len(pattern) and (pattern[i] != ']' or first):
+        first = False
+        if pattern[i] == '\\':
+            i += 1
+            if i == len(pattern):
+                break
+            escaped_letters, escaped_negated = _escaped_class(pattern, i)
+            if escaped_negated:
+                raise ValueError("Unsupported escape \\%s in a class in %r" % (pattern[i], pattern))
+            if len(escaped_letters) > 1:
+                letters.update(escaped_letters)
+                i += 1
+                continue
+        low = pattern[i]
+        i += 1
+        if i + 1 < len(pattern) and pattern[i] == '-' and pattern[i + 1] != ']':
+            high = pattern[i + 1]
+            if high == '\\' and i + 2 < len(pattern):
+                high_letters, _ = _escaped_class(pattern, i + 2)
+                if len(high_letters) > 1:
+                    raise ValueError("Bad range in %r" % pattern)
+                high = pattern[i + 2]
+                i += 1
+            if ord(high) < ord(low):
+                raise ValueError("Bad range %s-%s in %r" % (low, high, pattern))
+            letters.update(chr(c) for c in range(ord(low), ord(high) + 1))
+            i += 2
+        else:
+            letters.add(low)
+    if i == len(pattern):
+        raise ValueError("Unterminated character class in %r" % pattern)
+    return (frozenset(letters), negated), i + 1
+
+def _parse_repetition(pattern :str, i :int) -> tuple:
+    """
+    Parse a bounded repetition starting after the '{' at position 'i - 1'.
+    Returns:
+        A triple (low, high, i) where 'high' is 'math.inf' for '{m,}'
+        and 'i' is the position after the closing '}'.
+    """
+    end = pattern.find('}', i)
+    if end == -1:
+        raise ValueError("Unterminated repetition in %r" % pattern)
+    bounds = pattern[i:end].split(',')
+    try:
+        if len(bounds) == 1:
+            low = high = int(bounds[0])
+        elif len(bounds) == 2:
+            low = int(bounds[0]) if bounds[0] else 0
+            high = int(bounds[1]) if bounds[1] else math.inf
+        else:
+            raise ValueError
+    except ValueError:
+        raise ValueError("Bad repetition {%s} in %r" % (pattern[i:end], pattern))
+    if low < 0 or high < low:
+        raise ValueError("Bad repetition {%s} in %r" % (pattern[i:end], pattern))
+    return low, high, end + 1
+
+def compile_pattern(pattern :str) -> NFA:
+    """
+    Compile a restricted regular expression into an automaton.
+    Args:
+        pattern: The regular expression, see the documentation of the module.
+    Returns:
+        The 'NFA' recognizing the words matched by 'pattern'.
+    """
+    nfa = NFA()
+    # A fragment is a pair (start, dangling) where 'dangling' is the list
+    # of the states whose out-going transition is still to be set.
+    def patch(dangling, target):
+        for s in dangling:
+            nfa.outs[s].append(target)
+
+    def letter_fragment(letter_class):
+        s = nfa.add_state(CHAR, letter_class)
+        return (s, [s])
+
+    def optional_fragment(fragment):
+        s = nfa.add_state(SPLIT)
+        nfa.outs[s].append(fragment[0])
+        return (s, fragment[1] + [s])
+
+    def star_fragment(fragment):
+        s = nfa.add_state(SPLIT)
+        nfa.outs[s].append(fragment[0])
+        patch(fragment[1], s)
+        return (s, [s])
+
+    start = nfa.add_state(SPLIT)
+    dangling = [start]
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        i += 1
+        if c in SPECIAL:
+            raise ValueError("Unsupported operator %r in %r" % (c, pattern))
+        if c in '?*+{':
+            raise ValueError("Nothing to repeat at position %s in %r" % (i - 1, pattern))
+        if c == '.':
+            letter_class = ANY
+        elif c == '[':
+            letter_class, i = _parse_class(pattern, i)
+        elif c == '\\':
+            if i == len(pattern):
+                raise ValueError("Trailing backslash in %r" % pattern)
+            letter_class = _escaped_class(pattern, i)
+            i += 1
+        else:
+            letter_class = (frozenset(c), False)
+        low, high = 1, 1
+        if i < len(pattern) and pattern[i] in '?*+{':
+            quantifier = pattern[i]
+            i += 1
+            if quantifier == '?':
+                low, high = 0, 1
+            elif quantifier == '*':
+                low, high = 0, math.inf
+            elif quantifier == '+':
+                low, high = 1, math.inf
+            else:
+                low, high, i = _parse_repetition(pattern, i)
+        # 'low' mandatory copies, then 'high - low' optional copies or a star.
+        fragments = [letter_fragment(letter_class) for _ in range(low)]
+        if high == math.inf:
+            fragments.append(star_fragment(letter_fragment(letter_class)))
+        else:
+            fragments.extend(optional_fragment(letter_fragment(letter_class))
+                for _ in range(high - low))
+        for fragment in fragments:
+            patch(dangling, fragment[0])
+            dangling = fragment[1]
+    patch(dangling, nfa.add_state(MATCH))
+    nfa.start = start
+    return nfa
+
+def _implicit_suffixes(word, ukkonen_output :tuple) -> dict:
+    """
+    Locate in the suffix tree the suffixes of 'word' that have no leaf.
+    They are the non-empty suffixes of the factor of the active point '(node, position, length)',
+    and are reached one after the other by following the suffix links, as in 'short_ukkonen',
+    in time linear in their number.
+    Args:
+        word: The word used to build the suffix tree.
+        ukkonen_output: The tuple '(node, position, length, tree)' returned by 'short_ukkonen.ukkonen(word)'.
+    Returns:
+        A dictionnary associating to a node 's' the list of the triplets '(letter, offset, start)'
+        such that the suffix 'word[start:]' ends on the edge of 's' starting with 'letter',
+        after 'offset' letters, or at 's' itself if 'letter' is None.
+    """
+    node, position, length, tree = ukkonen_output
+    points = []
+    while node != ROOT or length > 0:
+        points.append((node, word[position] if length > 0 else None, length))
+        # move to the suffix non-canonical implicit node
+        if node == ROOT:
+            position += 1
+            length -= 1
+        else:
+            node = tree[node][SUFFIX]
+        # canonization of the implicit node
+        while length > 0:
+            edge_position, edge_length, child = tree[node][word[position]]
+            if edge_length > length:
+                position = edge_position
+                break
+            node = child
+            position += edge_length
+            length -= edge_length
+    implicit = {}
+    for t, (node, letter, offset) in enumerate(points):
+        implicit.setdefault(node, []).append((letter, offset, len(word) - len(points) + t))
+    return implicit
+
+def _leaf_positions(tree :list, node :int, depth :int, implicit :dict, positions :set):
+    """
+    Add to 'positions' the starting positions of the suffixes below 'node',
+    the string depth of 'node' being 'depth'.
+    The suffixes with no leaf are given by 'implicit', see '_implicit_suffixes'.
+    """
+    stack = [(node, depth)]
+    while stack:
+        node, depth = stack.pop()
+        positions.update(start for (_, _, start) in implicit.get(node, ()))
+        for letter, edge in tree[node].items():
+            if letter == SUFFIX:
+                continue
+            position, length, child = edge
+            if child == LEAF:
+                positions.add(position - depth)
+            else:
+                stack.append((child, depth + length))
+
+def search(word, ukkonen_output :tuple, pattern) -> list:
+    """
+    Find the occurrences of a pattern in a word, using its suffix tree.
+    Args:
+        word: The word used to build the suffix tree.
+        ukkonen_output: The tuple '(node, position, length, tree)' returned by 'short_ukkonen.ukkonen(word)'.
+        pattern: A str instance containing a restricted regular expression, or a compiled 'NFA'.
+    Returns:
+        The sorted list of the positions 'i' such that a prefix of 'word[i:]' matches 'pattern'.
+    """
+    nfa = pattern if isinstance(pattern, NFA) else compile_pattern(pattern)
+    tree = ukkonen_output[3]
+    n = len(word)
+    initial = nfa.initial()
+    if nfa.is_final(initial):
+        # The empty word matches, hence at any position.
+        return list(range(n + 1))
+    # The suffixes that occur elsewhere in 'word' have no leaf, they are reported with the leaves.
+    implicit = _implicit_suffixes(word, ukkonen_output)
+    positions = set()
+    # The pending nodes, with their string depth and the states reached when reading their factor.
+    stack = [(ROOT, 0, initial)]
+    while stack:
+        node, depth, states = stack.pop()
+        for letter, edge in tree[node].items():
+            if letter == SUFFIX:
+                continue
+            position, length, child = edge
+            current = states
+            for j in range(position, min(position + length, n)):
+                current = nfa.step(current, word[j])
+                if not current:
+                    break
+                if nfa.is_final(current):
+                    # The suffixes ending on this edge after the 'j - position + 1' letters read.
+                    positions.update(start for (implicit_letter, offset, start) in implicit.get(node, ())
+                        if implicit_letter == letter and offset > j - position)
+                    if child == LEAF:
+                        positions.add(position - depth)
+                    else:
+                        _leaf_positions(tree, child, depth + length, implicit, positions)
+                    current = None
+                    break
+            if current and child != LEAF:
+                stack.append((child, depth + length, current))
+    return sorted(positions)
+
+if __name__ == '__main__':
+    import sys
+    from short_ukkonen import ukkonen
+    word = sys.argv[1] if len(sys.argv) > 1 else "error: timeout, errr timeout, eror: ok"
+    pattern = sys.argv[2] if len(sys.argv) > 2 else "err?r.*timeout"
+    print(search(word, ukkonen(word), pattern))